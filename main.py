@@ -1,13 +1,21 @@
 import os
+import asyncio
+import io
 import json
 import random
+import re
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from telegram import Update
-from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes
+from telegram.ext import Application, ApplicationBuilder, CommandHandler, ContextTypes
 
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Locator, async_playwright, TimeoutError as PlaywrightTimeoutError
 
 logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s", level=logging.INFO
@@ -19,6 +27,216 @@ if not TELEGRAM_TOKEN:
     logger.error("Environment variable TELEGRAM_TOKEN is not set.")
     exit(1)
 
+# Keep a copy of every exam.json sent, for debugging.
+SAVE_EXAM_JSON = os.getenv("SAVE_EXAM_JSON", "").lower() in ("1", "true", "yes")
+
+# Google's consent cookies from the first successful scrape, reused by later
+# contexts so they skip the consent and redirect prompts. Only these cookies
+# are kept: the rest of the state belongs to a session that just submitted a
+# form, and sharing its login/response cookies across chats is not safe.
+# CONSENT/SOCS only record the cookie-banner choice. Delete the file to
+# refresh it.
+STATE_PATH = "state.json"
+_SHARED_COOKIE_NAMES = frozenset({"CONSENT", "SOCS"})
+
+SCRAPE_CONCURRENCY = 4
+SCRAPE_SEM = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+# Serializes relaunching the shared browser after a crash.
+BROWSER_LOCK = asyncio.Lock()
+
+# Images, fonts and media are never inspected, so requests for them are
+# aborted. Stylesheets are left alone: visibility waits, get_by_role,
+# click actionability and innerText all depend on computed style and layout.
+# Only URLs matching this pattern are routed to Python, so other requests
+# do not pay a handler round-trip. Playwright still disables the HTTP cache
+# once any route is registered.
+_BLOCKED_ASSETS_RE = re.compile(
+    r"\.(?:png|jpe?g|gif|webp|ico|bmp|woff2?|ttf|otf|eot|mp4|webm|mp3|ogg|wav)(?:\?.*)?$"
+    r"|//fonts\.gstatic\.com/"
+    r"|//lh\d\.googleusercontent\.com/"
+)
+
+# Nothing is rendered to a screen, so skip the GPU and background services.
+# --single-process is deliberately left out: the browser is shared by
+# concurrent scrapes and one renderer crash would take all of them down.
+_CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+]
+
+# Zero out Material transitions so Playwright does not wait for elements to
+# finish animating before interacting with them.
+_DISABLE_ANIMATIONS_JS = """
+(() => {
+    const style = document.createElement("style");
+    style.textContent = "*, *::before, *::after { animation-duration: 0s !important; animation-delay: 0s !important; transition-duration: 0s !important; transition-delay: 0s !important; }";
+    const inject = () => (document.head || document.documentElement).appendChild(style);
+    if (document.documentElement) {
+        inject();
+    } else {
+        document.addEventListener("DOMContentLoaded", inject, { once: true });
+    }
+})();
+"""
+
+
+# Selectors are kept at module scope so every call reuses the same strings.
+# Where the alternatives never apply together, a lookup is split into a
+# primary and a fallback so the common case only evaluates one selector.
+# The remaining comma unions are kept on purpose: querySelector on a union
+# returns the first match in DOM order, not the first alternative, and
+# _CHOICE_SEL/_TEXT_INPUT_SEL are used to collect every match in DOM order.
+# The next/send button unions likewise keep the baseline's DOM-order pick
+# between the jsname=V67aGc button and the one named التالي/إرسال.
+_FORM_SEL = "form"
+_Q_SEL = "div.freebirdFormviewerViewItemsItemItem"
+_Q_SEL_FALLBACK = "div[role=listitem]"
+_TITLE_SEL = "div.freebirdFormviewerViewHeaderTitle, div.freebirdFormviewerViewHeaderTitleRow"
+_TITLE_SEL_FALLBACK = "h1"
+_HEADING_SEL = "div.freebirdFormviewerViewItemsItemItemTitle, div[role=heading]"
+_CHOICE_SEL = "div.freebirdFormviewerViewItemsItemItemChoice, div[role=radio] label, div[role=radio]"
+_LABEL_SEL = "label"
+_CORRECT_SEL = "[aria-label*='correct']"
+_CORRECT_SEL_FALLBACK = "[aria-label*='صحيح']"
+_CORRECT_CLASS_SEL = ".freebirdFormviewerViewItemsItemCorrectAnswer"
+_TICK_PATH_SEL = "svg path[fill]"
+_RADIO_SEL = "div[role=radio]"
+_RADIO_SEL_FALLBACK = "input[type=radio]"
+# Unions for waits, where any match will do and precedence does not matter.
+_Q_ANY_SEL = f":is({_Q_SEL}, {_Q_SEL_FALLBACK})"
+_RADIO_ANY_SEL = f":is({_RADIO_SEL}, {_RADIO_SEL_FALLBACK})"
+_TEXT_INPUT_SEL = "input[type=text], input:not([type])"
+_CHECKBOX_SEL = "input[type=checkbox]"
+_NEXT_BTN_SEL = "div[role=button][jsname=V67aGc], div[role=button]:has-text('التالي')"
+_SEND_BTN_SEL = "div[role=button][jsname=V67aGc], div[role=button]:has-text('إرسال')"
+_VIEW_SCORE_SEL = ":is(div[role=button], button):has-text('عرض النتيجة')"
+
+
+# The exam category is written in parentheses inside the exam title.
+_CATEGORY_RE = re.compile(r"\(([^)]+)\)")
+
+_NAME_FIELD_TEXT = "اسم الطالب"
+_PLEDGE_TEXT = "أقسم"
+_NEXT_TEXT = "التالي"
+_SEND_TEXT = "إرسال"
+_VIEW_SCORE_TEXT = "عرض النتيجة"
+
+# Returns the index of the student-name input, falling back to the first text
+# input, or -1 when the page has none.
+_FIND_NAME_INPUT_JS = """
+(els, text) => {
+    const idx = els.findIndex((e) =>
+        ["aria-label", "placeholder", "name"].some((a) => (e.getAttribute(a) || "").includes(text))
+    );
+    return els.length ? Math.max(idx, 0) : -1;
+}
+"""
+
+# Returns the index (among the page's checkboxes) of the one belonging to the
+# pledge label, or -1.
+_FIND_PLEDGE_CHECKBOX_JS = """
+(els, args) => {
+    for (const label of document.querySelectorAll(args.label)) {
+        if (!label.innerText.includes(args.text)) {
+            continue;
+        }
+        const input = label.htmlFor
+            ? document.getElementById(label.htmlFor)
+            : label.querySelector(args.checkbox);
+        const idx = els.indexOf(input);
+        if (idx >= 0) {
+            return idx;
+        }
+    }
+    return -1;
+}
+"""
+
+
+# Walks the viewscore page in-browser and returns plain JSON
+# ({title, questions, errors}), so extraction costs a single round-trip and no
+# element handles. A question that throws is reported in errors and skipped
+# rather than losing the whole exam. Running it in the page (rather than
+# parsing page.content() locally) reuses the DOM the browser has already built
+# and keeps innerText semantics, which skip CSS-hidden nodes that a plain HTML
+# text dump would include. That only holds while stylesheets are loaded, which
+# is why _BLOCKED_ASSETS_RE leaves them alone.
+_EXTRACT_EXAM_JS = """
+(sel) => {
+    const CORRECT_FILL = /#34A853|green/i;
+    const text = (el) => (el ? (el.innerText ?? el.textContent ?? "").trim() : "");
+
+    const extractQuestion = (q, i) => {
+        const question = text(q.querySelector(sel.heading));
+
+        let choices = [...q.querySelectorAll(sel.choice)].map(text).filter(Boolean);
+        if (!choices.length) {
+            choices = [...q.querySelectorAll(sel.choiceFallback)].map(text).filter(Boolean);
+        }
+
+        let answer = text(q.querySelector(sel.correct) || q.querySelector(sel.correctFallback));
+        if (!answer) {
+            const tick = [...q.querySelectorAll(sel.tickPath)].find((p) => CORRECT_FILL.test(p.getAttribute("fill")));
+            const svg = tick?.closest("svg");
+            if (svg) {
+                answer = text(svg.closest("label") || svg.parentElement);
+            }
+        }
+        if (!answer) {
+            answer = text(q.querySelector(sel.correctClass));
+        }
+
+        return {
+            question_number: i + 1,
+            question: question,
+            type: "اختيار",
+            choices: choices,
+            answer: answer,
+        };
+    };
+
+    const title = text(document.querySelector(sel.title) || document.querySelector(sel.titleFallback));
+    let questions = document.querySelectorAll(sel.question);
+    if (!questions.length) {
+        questions = document.querySelectorAll(sel.questionFallback);
+    }
+
+    const items = [];
+    const errors = [];
+    [...questions].forEach((q, i) => {
+        try {
+            items.push(extractQuestion(q, i));
+        } catch (e) {
+            errors.push({ question_number: i + 1, message: String(e) });
+        }
+    });
+    return { title: title, questions: items, errors: errors };
+}
+"""
+
+_EXTRACT_EXAM_ARGS = {
+    "title": _TITLE_SEL,
+    "titleFallback": _TITLE_SEL_FALLBACK,
+    "question": _Q_SEL,
+    "questionFallback": _Q_SEL_FALLBACK,
+    "heading": _HEADING_SEL,
+    "choice": _CHOICE_SEL,
+    "choiceFallback": _LABEL_SEL,
+    "correct": _CORRECT_SEL,
+    "correctFallback": _CORRECT_SEL_FALLBACK,
+    "correctClass": _CORRECT_CLASS_SEL,
+    "tickPath": _TICK_PATH_SEL,
+}
+
+
+def dump_exam_json(exam_data: List[Dict]) -> bytes:
+    """Serialize exam data to indented UTF-8 JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(exam_data, option=orjson.OPT_INDENT_2)
+    return json.dumps(exam_data, ensure_ascii=False, indent=2).encode("utf-8")
+
 
 async def extract_exam_data(page) -> List[Dict]:
     """
@@ -27,110 +245,46 @@ async def extract_exam_data(page) -> List[Dict]:
     """
     logger.info("Extracting exam data from viewscore page...")
 
-    # Extract exam title and category
-    exam_title = ""
-    category = ""
     try:
-        exam_title_el = await page.query_selector("div.freebirdFormviewerViewHeaderTitle, div.freebirdFormviewerViewHeaderTitleRow")
-        if exam_title_el:
-            exam_title = await exam_title_el.inner_text()
-            exam_title = exam_title.strip()
-        else:
-            h1 = await page.query_selector("h1")
-            if h1:
-                exam_title = await h1.inner_text()
-                exam_title = exam_title.strip()
-    except Exception:
-        pass
-
-    if "(" in exam_title and ")" in exam_title:
-        start = exam_title.find("(") + 1
-        end = exam_title.find(")")
-        category = exam_title[start:end].strip()
-
-    questions = await page.query_selector_all("div.freebirdFormviewerViewItemsItemItem")
-    if not questions:
-        questions = await page.query_selector_all("div[role=listitem]")
-
-    exam_data = []
-    for i, q in enumerate(questions, start=1):
-        try:
-            q_text_el = await q.query_selector("div.freebirdFormviewerViewItemsItemItemTitle, div[role=heading]")
-            q_text = (await q_text_el.inner_text()).strip() if q_text_el else ""
-
-            choice_labels = await q.query_selector_all("div.freebirdFormviewerViewItemsItemItemChoice, div[role=radio] label, div[role=radio]")
-            choices = []
-            for c in choice_labels:
-                text = (await c.inner_text()).strip()
-                if text:
-                    choices.append(text)
-            if not choices:
-                labels = await q.query_selector_all("label")
-                for l in labels:
-                    t = (await l.inner_text()).strip()
-                    if t:
-                        choices.append(t)
-
-            answer = ""
-            correct_el = await q.query_selector("[aria-label*='correct'], [aria-label*='صحيح']")
-            if correct_el:
-                answer = (await correct_el.inner_text()).strip()
-            else:
-                svgs = await q.query_selector_all("svg")
-                for svg in svgs:
-                    try:
-                        path = await svg.query_selector("path")
-                        if path:
-                            fill = await path.get_attribute("fill")
-                            if fill and ("#34A853" in fill or "green" in fill.lower()):
-                                parent = await svg.evaluate_handle("e => e.closest('label') || e.parentElement")
-                                if parent:
-                                    answer = (await parent.inner_text()).strip()
-                                    break
-                    except Exception:
-                        continue
-
-            if not answer:
-                correct_class_el = await q.query_selector(".freebirdFormviewerViewItemsItemCorrectAnswer")
-                if correct_class_el:
-                    answer = (await correct_class_el.inner_text()).strip()
-
-            if not answer and choices:
-                answer = ""
-
-            exam_data.append(
-                {
-                    "question_number": i,
-                    "question": q_text,
-                    "type": "اختيار",
-                    "choices": choices,
-                    "answer": answer,
-                    "exam": exam_title,
-                    "category": category,
-                }
-            )
-        except Exception as e:
-            logger.warning(f"Failed to extract question {i}: {e}")
+        result = await page.evaluate(_EXTRACT_EXAM_JS, _EXTRACT_EXAM_ARGS)
+    except Exception as e:
+        logger.warning(f"Failed to extract exam data: {e}")
+        return []
+
+    exam_title = result["title"]
+    m = _CATEGORY_RE.search(exam_title)
+    category = m.group(1).strip() if m else ""
+
+    for err in result["errors"]:
+        logger.warning(f"Failed to extract question {err['question_number']}: {err['message']}")
+
+    exam_data = result["questions"]
+    for item in exam_data:
+        item["exam"] = exam_title
+        item["category"] = category
 
     return exam_data
 
 
+async def find_button(page, name: str, primary: Optional[str] = None) -> Optional[Locator]:
+    """
+    Find a button by its accessible name, preferring the `primary` selector when given.
+    Returns None if no matching button exists.
+    """
+    if primary:
+        btn = page.locator(primary).first
+        if await btn.count():
+            return btn
+    btn = page.get_by_role("button", name=name).first
+    return btn if await btn.count() else None
+
+
 async def fill_first_page(page):
     logger.info("Filling first page...")
     try:
-        inputs = await page.query_selector_all("input[type=text], input:not([type])")
-        input_el = None
-        for inp in inputs:
-            aria = await inp.get_attribute("aria-label") or ""
-            placeholder = await inp.get_attribute("placeholder") or ""
-            name = await inp.get_attribute("name") or ""
-            if "اسم الطالب" in aria or "اسم الطالب" in placeholder or "اسم الطالب" in name:
-                input_el = inp
-                break
-        if not input_el:
-            input_el = inputs[0] if inputs else None
-        if input_el:
-            await input_el.fill("Bot Test")
+        idx = await page.eval_on_selector_all(_TEXT_INPUT_SEL, _FIND_NAME_INPUT_JS, _NAME_FIELD_TEXT)
+        if idx >= 0:
+            await page.locator(_TEXT_INPUT_SEL).nth(idx).fill("Bot Test")
             logger.info("Filled 'اسم الطالب' with 'Bot Test'.")
         else:
             logger.warning("Could not find 'اسم الطالب' input field.")
@@ -138,20 +292,13 @@ async def fill_first_page(page):
         logger.warning(f"Error filling 'اسم الطالب': {e}")
 
     try:
-        labels = await page.query_selector_all("label")
-        checkbox_input = None
-        for label in labels:
-            text = await label.inner_text()
-            if "أقسم" in text:
-                for_attr = await label.get_attribute("for")
-                if for_attr:
-                    checkbox_input = await page.query_selector(f"#{for_attr}")
-                else:
-                    checkbox_input = await label.query_selector("input[type=checkbox]")
-                if checkbox_input:
-                    break
-        if checkbox_input:
-            await checkbox_input.check()
+        idx = await page.eval_on_selector_all(
+            _CHECKBOX_SEL,
+            _FIND_PLEDGE_CHECKBOX_JS,
+            {"label": _LABEL_SEL, "checkbox": _CHECKBOX_SEL, "text": _PLEDGE_TEXT},
+        )
+        if idx >= 0:
+            await page.locator(_CHECKBOX_SEL).nth(idx).check()
             logger.info("Checked the 'أقسم أنني...' checkbox.")
         else:
             logger.warning("Could not find the checkbox 'أقسم أنني...'.")
@@ -159,13 +306,7 @@ async def fill_first_page(page):
         logger.warning(f"Error checking checkbox: {e}")
 
     try:
-        next_btn = await page.query_selector("div[role=button][jsname=V67aGc], div[role=button]:has-text('التالي')")
-        if not next_btn:
-            buttons = await page.query_selector_all("div[role=button]")
-            for b in buttons:
-                if "التالي" in await b.inner_text():
-                    next_btn = b
-                    break
+        next_btn = await find_button(page, _NEXT_TEXT, primary=_NEXT_BTN_SEL)
         if next_btn:
             await next_btn.click()
             logger.info("Clicked 'التالي' button.")
@@ -175,27 +316,35 @@ async def fill_first_page(page):
         logger.warning(f"Error clicking 'التالي' button: {e}")
 
 
+async def find_radios(question) -> List:
+    radios = await question.query_selector_all(_RADIO_SEL)
+    if not radios:
+        radios = await question.query_selector_all(_RADIO_SEL_FALLBACK)
+    return radios
+
+
 async def fill_second_page(page):
     logger.info("Filling second page with random choices...")
     try:
-        questions = await page.query_selector_all("div.freebirdFormviewerViewItemsItemItem")
+        questions = await page.query_selector_all(_Q_SEL)
         if not questions:
-            questions = await page.query_selector_all("div[role=listitem]")
+            questions = await page.query_selector_all(_Q_SEL_FALLBACK)
         if not questions:
             logger.warning("No questions found on second page.")
             return
 
-        for q in questions:
-            radios = await q.query_selector_all("div[role=radio]")
-            if not radios:
-                radios = await q.query_selector_all("input[type=radio]")
+        # The lookups are independent, so issue them together rather than one
+        # round-trip per question; clicking stays sequential.
+        all_radios = await asyncio.gather(*(find_radios(q) for q in questions))
+
+        for radios in all_radios:
             if radios:
                 choice = random.choice(radios)
                 try:
                     await choice.click()
                 except Exception:
                     try:
-                        label = await choice.query_selector("label")
+                        label = await choice.query_selector(_LABEL_SEL)
                         if label:
                             await label.click()
                         else:
@@ -205,13 +354,7 @@ async def fill_second_page(page):
             else:
                 logger.warning("No radio buttons found for a question.")
 
-        submit_btn = await page.query_selector("div[role=button][jsname=V67aGc], div[role=button]:has-text('إرسال')")
-        if not submit_btn:
-            buttons = await page.query_selector_all("div[role=button]")
-            for b in buttons:
-                if "إرسال" in await b.inner_text():
-                    submit_btn = b
-                    break
+        submit_btn = await find_button(page, _SEND_TEXT, primary=_SEND_BTN_SEL)
         if submit_btn:
             await submit_btn.click()
             logger.info("Clicked 'إرسال' button.")
@@ -224,15 +367,7 @@ async def fill_second_page(page):
 async def click_view_score(page) -> bool:
     logger.info("Trying to click 'عرض النتيجة' button...")
     try:
-        btn = await page.query_selector("div[role=button]:has-text('عرض النتيجة')")
-        if not btn:
-            btn = await page.query_selector("button:has-text('عرض النتيجة')")
-        if not btn:
-            all_btns = await page.query_selector_all("div[role=button], button, input[type=button]")
-            for b in all_btns:
-                if (await b.inner_text()).strip() == "عرض النتيجة":
-                    btn = b
-                    break
+        btn = await find_button(page, _VIEW_SCORE_TEXT)
         if btn:
             await btn.click()
             logger.info("Clicked 'عرض النتيجة' button.")
@@ -245,6 +380,46 @@ async def click_view_score(page) -> bool:
         return False
 
 
+async def new_scrape_context(browser):
+    """
+    Create a browser context, seeded from STATE_PATH when it exists.
+    A state file that cannot be read or parsed is discarded and a plain context
+    is used; browser errors propagate to the caller.
+    """
+    if os.path.exists(STATE_PATH):
+        try:
+            return await browser.new_context(reduced_motion="reduce", storage_state=STATE_PATH)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable {STATE_PATH}: {e}")
+            try:
+                os.remove(STATE_PATH)
+            except FileNotFoundError:
+                pass
+    return await browser.new_context(reduced_motion="reduce")
+
+
+async def save_storage_state(context_browser):
+    """
+    Save the context's consent cookies to STATE_PATH if it does not exist yet.
+    The file is written to a temp path and moved into place, so readers never
+    see a partial write. Nothing awaits between the final existence check and
+    the replace, so concurrent scrapes cannot both write it.
+    """
+    if os.path.exists(STATE_PATH):
+        return
+    state = await context_browser.storage_state()
+    cookies = [c for c in state["cookies"] if c["name"] in _SHARED_COOKIE_NAMES]
+    if not cookies:
+        return
+    if os.path.exists(STATE_PATH):
+        return
+    tmp_path = f"{STATE_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"cookies": cookies, "origins": []}, f)
+    os.replace(tmp_path, STATE_PATH)
+    logger.info(f"Browser storage state saved to {STATE_PATH}")
+
+
 async def scrape_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args or len(context.args) != 1:
         await update.message.reply_text("❗️ الرجاء إرسال رابط الفورم مع الأمر: /scrape <form_url>")
@@ -257,65 +432,135 @@ async def scrape_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await update.message.reply_text("⏳ جاري معالجة الفورم...")
 
-    try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context_browser = await browser.new_context()
-            page = await context_browser.new_page()
+    context.application.create_task(run_scrape(update, context, form_url), update=update)
 
-            logger.info("Navigating to form URL...")
-            await page.goto(form_url, timeout=30000)
 
-            await page.wait_for_selector("form", timeout=15000)
+async def run_scrape(update: Update, context: ContextTypes.DEFAULT_TYPE, form_url: str):
+    """
+    Scrape the form in its own browser context and send the result to the chat.
+    At most SCRAPE_CONCURRENCY scrapes run at once; the rest wait their turn.
+    """
+    async with SCRAPE_SEM:
+        await _scrape(update, context, form_url)
 
-            await fill_first_page(page)
 
-            try:
-                await page.wait_for_selector("div[role=radio], input[type=radio]", timeout=15000)
-            except PlaywrightTimeoutError:
-                logger.warning("Timeout waiting for second page radio buttons.")
+async def _scrape(update: Update, context: ContextTypes.DEFAULT_TYPE, form_url: str):
+    chat_id = update.effective_chat.id
+    context_browser = None
+    try:
+        browser = await get_browser(context.application)
+        context_browser = await new_scrape_context(browser)
+        await context_browser.route(_BLOCKED_ASSETS_RE, lambda route: route.abort())
+        await context_browser.add_init_script(_DISABLE_ANIMATIONS_JS)
+        page = await context_browser.new_page()
 
-            await fill_second_page(page)
+        logger.info("Navigating to form URL...")
+        await page.goto(form_url, timeout=30000)
 
-            try:
-                await page.wait_for_selector("div[role=button]:has-text('عرض النتيجة')", timeout=15000)
-            except PlaywrightTimeoutError:
-                logger.warning("Timeout waiting for confirmation page with 'عرض النتيجة' button.")
+        await page.wait_for_selector(_FORM_SEL, timeout=15000)
 
-            if not await click_view_score(page):
-                await update.message.reply_text("⚠️ تعذر استخراج النتائج.")
-                logger.error("Failed to find or click 'عرض النتيجة' button.")
-                await browser.close()
-                return
+        await fill_first_page(page)
+
+        try:
+            await page.wait_for_selector(_RADIO_ANY_SEL, timeout=15000)
+        except PlaywrightTimeoutError:
+            logger.warning("Timeout waiting for second page radio buttons.")
 
-            await page.wait_for_load_state("networkidle", timeout=15000)
+        await fill_second_page(page)
 
-            exam_data = await extract_exam_data(page)
-            if not exam_data:
-                await update.message.reply_text("⚠️ تعذر استخراج النتائج.")
-                logger.error("No exam data extracted.")
-                await browser.close()
-                return
+        try:
+            await page.wait_for_selector(_VIEW_SCORE_SEL, timeout=15000)
+        except PlaywrightTimeoutError:
+            logger.warning("Timeout waiting for confirmation page with 'عرض النتيجة' button.")
 
-            with open("exam.json", "w", encoding="utf-8") as f:
-                json.dump(exam_data, f, ensure_ascii=False, indent=2)
+        if not await click_view_score(page):
+            await update.message.reply_text("⚠️ تعذر استخراج النتائج.")
+            logger.error("Failed to find or click 'عرض النتيجة' button.")
+            return
 
+        try:
+            await page.wait_for_selector(_Q_ANY_SEL, timeout=15000)
+        except PlaywrightTimeoutError:
+            logger.warning("Timeout waiting for questions on viewscore page.")
+
+        exam_data = await extract_exam_data(page)
+        if not exam_data:
+            await update.message.reply_text("⚠️ تعذر استخراج النتائج.")
+            logger.error("No exam data extracted.")
+            return
+
+        data = dump_exam_json(exam_data)
+
+        if SAVE_EXAM_JSON:
+            with open("exam.json", "wb") as f:
+                f.write(data)
             logger.info("Exam data saved to exam.json")
 
-            with open("exam.json", "rb") as f:
-                await context.bot.send_document(chat_id=chat_id, document=f, filename="exam.json")
+        buf = io.BytesIO(data)
+        buf.name = "exam.json"
+        await context.bot.send_document(chat_id=chat_id, document=buf, filename="exam.json")
+
+        try:
+            await save_storage_state(context_browser)
+        except Exception as e:
+            logger.warning(f"Failed to save browser storage state: {e}")
 
-            await browser.close()
-            logger.info("Scraping completed successfully.")
+        logger.info("Scraping completed successfully.")
 
     except Exception as e:
         logger.error(f"Exception during scraping: {e}")
         await update.message.reply_text("⚠️ تعذر استخراج النتائج.")
+    finally:
+        if context_browser:
+            await context_browser.close()
+
+
+async def launch_browser(app: Application):
+    logger.info("Launching browser...")
+    app.bot_data["browser"] = await app.bot_data["playwright"].chromium.launch(
+        headless=True,
+        chromium_sandbox=False,
+        args=_CHROMIUM_ARGS,
+    )
+
+
+async def get_browser(app: Application):
+    """
+    Return the shared browser, relaunching it first if it crashed or disconnected.
+    """
+    async with BROWSER_LOCK:
+        browser = app.bot_data.get("browser")
+        if browser is None or not browser.is_connected():
+            logger.warning("Browser is not connected; relaunching.")
+            await launch_browser(app)
+        return app.bot_data["browser"]
+
+
+async def start_browser(app: Application):
+    """Launch a single Chromium instance shared by every /scrape command."""
+    app.bot_data["playwright"] = await async_playwright().start()
+    await launch_browser(app)
+
+
+async def stop_browser(app: Application):
+    logger.info("Closing browser...")
+    browser = app.bot_data.pop("browser", None)
+    if browser:
+        await browser.close()
+    playwright = app.bot_data.pop("playwright", None)
+    if playwright:
+        await playwright.stop()
 
 
 def main():
     logger.info("Starting Telegram bot...")
-    app = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
+    app = (
+        ApplicationBuilder()
+        .token(TELEGRAM_TOKEN)
+        .post_init(start_browser)
+        .post_shutdown(stop_browser)
+        .build()
+    )
 
     app.add_handler(CommandHandler("scrape", scrape_command))
 